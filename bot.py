@@ -1,14 +1,19 @@
 """Main bot operation."""
 # pylint: disable=missing-function-docstring,broad-exception-caught
 from __future__ import annotations
-from asyncio import new_event_loop, set_event_loop, run_coroutine_threadsafe, sleep
-from dataclasses import dataclass, field, asdict, fields
+from asyncio import (FIRST_COMPLETED, set_event_loop, run_coroutine_threadsafe,
+                     sleep, create_task, wait, wrap_future)
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from functools import cache, lru_cache
+from inspect import iscoroutinefunction
 import json
+from operator import attrgetter
 import os
+import sys
 from time import perf_counter
 import traceback
-from typing import Literal, Type, Any
+from typing import Callable, ClassVar, Literal, Type, Any
 
 from dotenv import dotenv_values, set_key
 from websockets.exceptions import ConnectionClosed
@@ -23,21 +28,19 @@ from message import (MessageParser, Message, LoginMessage, CapabilitiesMessage,
                      RoomstateMessage, ClearchatMessage, ClearmsgMessage, UsernoticeMessage,
                      WhisperMessage, ChatMessage)
 from timer_ import Timer
-from twirc import TwitchIRCClient
+from twirc import TwitchIRCClient, RichTwitchIRCClient
 
+try:  # prefer a libuv-based event loop when one is installed
+    from uvloop import new_event_loop
+except ImportError:
+    try:
+        from winloop import new_event_loop
+    except ImportError:
+        from asyncio import new_event_loop
 
-os.system("color")
 
+os.system("color")
 
-def divmods(value: int | float, **divisors) -> dict[str, int | float]:
-    """Chain divmod calculations together with multiple divisors."""
-    divisors = dict(sorted(divisors.items(), key=lambda item: item[1], reverse=True))
-    quotients, remainder = {}, value
-    for name, divisor in divisors.items():
-        quotient, remainder = divmod(remainder, divisor)
-        quotients[name] = int(quotient)
-    quotients["remainder"] = remainder
-    return quotients
 
 def read_time(unix: int | float | str, time_type: Literal["stamp", "word"]) -> str:
     """
@@ -45,22 +48,40 @@ def read_time(unix: int | float | str, time_type: Literal["stamp", "word"]) -> s
     `stamp` - timestamp, typical stopwatch counter\n
     `word` - letter indicators for each unit, more reader-friendly
     """
-    quotients = divmods(float(unix), day=86400, hour=3600, minute=60, second=1)
-    hms_time = (str(quotients["hour"]), str(quotients["minute"]), str(quotients["second"]))
-    day, milli = str(quotients["day"]), str(round(quotients["remainder"]*1000))
+    day, remainder = divmod(float(unix), 86400)
+    hour, remainder = divmod(remainder, 3600)
+    minute, remainder = divmod(remainder, 60)
+    second, remainder = divmod(remainder, 1)
+    day, hour, minute, second = int(day), int(hour), int(minute), int(second)
     if time_type == "stamp":
-        hms_time = map(lambda x: x.zfill(2), hms_time)
-        return f"{day}:{':'.join(hms_time)}.{milli.zfill(3)}"
-    word_time = list(
-            filter(lambda x: not x.startswith('0'),
-                   [f"{day}d", f"{hms_time[0]}h", f"{hms_time[1]}m", f"{hms_time[2]}s"])
-        )
+        return f"{day}:{hour:02}:{minute:02}:{second:02}.{round(remainder*1000):03}"
+    word_time = []
+    if day:
+        word_time.append(f"{day}d")
+    if hour:
+        word_time.append(f"{hour}h")
+    if minute:
+        word_time.append(f"{minute}m")
+    if second:
+        word_time.append(f"{second}s")
     return ' '.join(word_time) if word_time else "0s"
 
+@lru_cache(maxsize=4096)
 def get_name_color(hex_string: str) -> RGBColor:
-    """Convert username color tag to RGB, and then adjust for readability."""
+    """
+    Convert username color tag to RGB, and then adjust for readability.\n
+    Results are cached since chatters keep the same color across messages.
+    """
     return readable(RGBColor.from_hex(hex_string))
 
+@cache
+def load_env(path: str = ".env") -> dict[str, str | None]:
+    """
+    Read variables from a .env file.\n
+    The file is parsed once and reused until `BaseConfig.set_variable` writes to it.
+    """
+    return dotenv_values(path)
+
 
 @dataclass
 class BaseConfig:
@@ -79,24 +100,50 @@ class BaseConfig:
     oauth: str
     capability: tuple[str]
 
+    # converters from raw .env strings, keyed by variable name; other fields are kept as-is
+    parsers: ClassVar[dict[str, Callable[[str], Any]]] = {
+        "ONLINE_CHANNELS": lambda value: tuple(json.loads(value)),
+        "OFFLINE_CHANNELS": lambda value: tuple(json.loads(value)),
+        "CAPABILITY": lambda value: tuple(json.loads(value)),
+        "RICH_IRC": lambda value: value == "True",
+        "SHOW_ERRORS": lambda value: value == "True",
+        "HISTORY_LIMIT": int
+        }
+
+    # checks for fields that need more than a non-empty value
+    validators: ClassVar[dict[str, Callable[[Any], bool]]] = {
+        "online_channels": lambda value: isinstance(value, tuple),
+        "offline_channels": lambda value: isinstance(value, tuple),
+        "usernames_folder": lambda value: any(separator and separator in value
+                                              for separator in (os.path.sep, os.path.altsep)),
+        "rich_irc": lambda value: isinstance(value, bool),
+        "show_errors": lambda value: isinstance(value, bool),
+        "history_limit": lambda value: isinstance(value, int) and value > 0,
+        "uri": lambda value: "://irc" in value,
+        "client_id": lambda value: len(value) == 30 and value.isalnum(),
+        "client_secret": lambda value: len(value) == 30 and value.isalnum(),
+        "oauth": lambda value: (len(value) == 36 and value.startswith("oauth:")
+                                and value[6:].isalnum())
+        }
+
     @classmethod
     def from_env(cls) -> BaseConfig:
         """Create a config instance from a .env file."""
-        config_fields = [field.name.upper() for field in fields(cls)]
-        config = dict(dotenv_values(".env").items())
-        if not set(config_fields).issubset(set(config.keys())):
-            raise RuntimeError("One or more configuration fields are missing")
-        for key, value in config.items():
-            if key in {"ONLINE_CHANNELS", "OFFLINE_CHANNELS", "CAPABILITY"}:
-                config[key] = tuple(json.loads(value))  # type: ignore
-            elif key in {"RICH_IRC", "SHOW_ERRORS"}:
-                config[key] = value == "True"  # type: ignore
-            elif key in {"HISTORY_LIMIT"}:
-                config[key] = int(value)  # type: ignore
-            elif key not in config_fields:
-                del config[key]
-        config = {key.lower(): value for key, value in config.items()}
-        return cls(**config)  # type: ignore
+        config = load_env()
+        values = {}
+        for name in cls.field_names():
+            key = name.upper()
+            if key not in config:
+                raise RuntimeError("One or more configuration fields are missing")
+            value = config[key]
+            values[name] = cls.parsers[key](value) if key in cls.parsers else value
+        return cls(**values)
+
+    @classmethod
+    @cache
+    def field_names(cls) -> tuple[str, ...]:
+        """Names of all configuration fields, computed once per config class."""
+        return tuple(config_field.name for config_field in fields(cls))
 
     @staticmethod
     def initialize_env():
@@ -125,39 +172,20 @@ class BaseConfig:
         if isinstance(value, list):
             value = json.dumps(value)
         set_key(".env", key, str(value), quote_mode="never")
+        load_env.cache_clear()
 
     @property
     def is_valid(self) -> bool:
         """Whether the bot has a (mostly) valid configuration."""
         if not self.channels:  # no channels added
             return False
-        config_fields = [field.name.upper() for field in fields(self)]
-        for field_name in config_fields:
-            field_value = getattr(self, field_name.lower())
-            if (field_name not in {"ONLINE_CHANNELS", "OFFLINE_CHANNELS"}
-                    and not field_value):
+        names = self.field_names()
+        for name, value in zip(names, attrgetter(*names)(self)):
+            if name in self.validators:
+                if not self.validators[name](value):
+                    return False
+            elif not value:  # fields without a specific check just need to be set
                 return False
-            match field_name:
-                case "USERNAMES_FOLDER":
-                    if all(separator not in field_value
-                           for separator in (os.path.sep, os.path.altsep)):
-                        return False
-                case "RICH_IRC" | "SHOW_ERRORS":
-                    if not isinstance(field_value, bool):
-                        return False
-                case "HISTORY_LIMIT":
-                    if not isinstance(field_value, int):
-                        return False
-                case "URI":
-                    if "://irc" not in field_value:
-                        return False
-                case "CLIENT_ID" | "CLIENT_SECRET":
-                    if not (len(field_value) == 30 and field_value.isalnum()):
-                        return False
-                case "OAUTH":
-                    if not (len(field_value) == 36 and field_value.startswith("oauth:")
-                            and field_value[6:].isalnum()):
-                        return False
         return True
 
     @property
@@ -177,8 +205,41 @@ class Ranks:
         """Check if a user is currently blacklisted from the bot."""
         return DenialReason.BLACKLIST if user in self.blacklist else DenialReason.NONE
 
+    def to_dict(self) -> dict[str, str | list[str]]:
+        """Plain dictionary of rank data for serialization."""
+        return {"owner": self.owner,
+                "admins": list(self.admins),
+                "blacklist": list(self.blacklist)}
+
 
 SUBSCRIBER_COLOR = RGBColor(145, 70, 255)
+SUB_TAG = f'[{color("SUB", SUBSCRIBER_COLOR)}]'
+MOD_TAG = f'[{color("MOD", RGB.GREEN)}]'
+VIP_TAG = f'[{color("VIP", RGB.PINK)}]'
+
+
+def role_tags(role: UserRole) -> str:
+    """Colored chat name prefix for a user's displayed roles (mod takes priority over vip)."""
+    tags = ''
+    if role & UserRole.MOD:
+        tags += f"{MOD_TAG} "
+    elif role & UserRole.VIP:
+        tags += f"{VIP_TAG} "
+    if role & UserRole.SUB:
+        tags += f"{SUB_TAG} "
+    return tags
+
+
+# prefixes for every combination of displayed roles, looked up per chat message
+ROLE_TAG_MASK = UserRole.SUB | UserRole.VIP | UserRole.MOD
+ROLE_TAGS = {role: role_tags(UserRole(role)) for role in range(ROLE_TAG_MASK + 1)}
+
+IGNORED_TYPES = frozenset({"002", "003", "004", "375", "372",
+                           "376", "GLOBALUSERSTATE", "HOSTTARGET"})
+# colored IRC type labels for console output, built once rather than per message
+COLORED_TYPES = {type_: color(type_, RGB.ORANGE) for type_ in (
+    "001", "CAP * ACK", "PING", "RECONNECT", "WHISPER", "353", "JOIN", "PART", "366",
+    "NOTICE", "USERSTATE", "ROOMSTATE", "CLEARCHAT", "CLEARMSG", "USERNOTICE", "PRIVMSG")}
 
 
 class BaseBot:
@@ -205,7 +266,7 @@ class BaseBot:
             print("ranks.json not found, creating one...")
             self.ranks = Ranks(owner=self.config.username)  # default owner is the bot itself
             with open("ranks.json", 'w', encoding="UTF-8") as file:
-                file.write(json.dumps(asdict(self.ranks), indent=4, separators=(',', ': ')))
+                file.write(json.dumps(self.ranks.to_dict(), indent=4, separators=(',', ': ')))
             print("Edit ranks.json and relaunch the bot to update ranks.")
 
         self.start_time = perf_counter()
@@ -215,16 +276,53 @@ class BaseBot:
         self.active = active
         self.event_loop = new_event_loop()
         set_event_loop(self.event_loop)
-        self.irc = TwitchIRCClient(rich_irc=self.config.rich_irc)
+        # the client class is picked once so sends never check whether to log themselves
+        self.irc = RichTwitchIRCClient() if self.config.rich_irc else TwitchIRCClient()
+        self._output: list[str] = []
+        # IRC type -> (handler, whether it takes the channel)
+        handlers: dict[str, tuple[Callable, bool]] = {
+            "001": (self._handle_001, False),
+            "CAP * ACK": (self._handle_cap_ack, False),
+            "PING": (self._handle_ping, False),
+            "RECONNECT": (self._handle_reconnect, False),
+            "WHISPER": (self._handle_whisper, False),
+            "353": (self._handle_353, True),
+            "JOIN": (self._handle_join, True),
+            "PART": (self._handle_part, True),
+            "366": (self._handle_366, True),
+            "NOTICE": (self._handle_notice, True),
+            "USERSTATE": (self._handle_userstate, True),
+            "ROOMSTATE": (self._handle_roomstate, True),
+            "CLEARCHAT": (self._handle_clearchat, True),
+            "CLEARMSG": (self._handle_clearmsg, True),
+            "USERNOTICE": (self._handle_usernotice, True),
+            "PRIVMSG": (self._handle_privmsg, True)  # any user-sent message
+            }
+        # IRC type -> (handler, whether it takes the channel, whether it must be awaited)
+        self._handlers: dict[str, tuple[Callable, bool, bool]] = {
+            type_: (handler, needs_channel, iscoroutinefunction(handler))
+            for type_, (handler, needs_channel) in handlers.items()}
 
     async def poll_irc(self):
         """Poll the Twitch server continuously for incoming messages."""
         while self.running:
             raw_data: str = await self.irc.websocket.recv()  # type: ignore
-            messages = raw_data.strip().split("\r\n")
-            for line in messages:
-                msg = MessageParser.from_raw(line)
-                await self.message_handler(msg)
+            try:
+                # lines are handled one at a time so a bad line can't drop earlier ones
+                for line in raw_data.strip().split("\r\n"):
+                    await self.message_handler(MessageParser.from_raw(line))
+            finally:
+                self.flush_output()
+
+    def _log(self, line: str):
+        """Buffer a line of console output until the current batch of messages is handled."""
+        self._output.append(line)
+
+    def flush_output(self):
+        """Write all buffered console output at once."""
+        if self._output:
+            sys.stdout.write('\n'.join(self._output) + '\n')
+            self._output.clear()
 
     async def start(self):
         """Start the bot."""
@@ -240,13 +338,18 @@ class BaseBot:
                 await self._set_up_channels()
                 # preload live check in case the timer starts late
                 await Timer.timers["check_live_status"](self)
-                while self.running:
-                    for func in Timer.timers.values():
-                        await func(self)
-                    if server_poll.done():
-                        print(server_poll.result())
-                        self.running = False
-                    await sleep(1)
+                # each timer sleeps until it is next due instead of polling every second
+                timer_tasks = [create_task(self._run_timer(timer))
+                               for timer in Timer.timers.values()]
+                try:
+                    done, _ = await wait([wrap_future(server_poll), *timer_tasks],
+                                         return_when=FIRST_COMPLETED)
+                    for task in done:
+                        task.result()  # surface whatever stopped the bot
+                finally:
+                    self.running = False
+                    for task in timer_tasks:
+                        task.cancel()
             except KeyboardInterrupt:
                 pass
             except ConnectionClosed:
@@ -257,6 +360,12 @@ class BaseBot:
             except Exception:
                 print(traceback.format_exc())
 
+    async def _run_timer(self, timer: Timer):
+        """Run a timer for as long as the bot is running."""
+        while self.running:
+            await timer(self)
+            await sleep(timer.remaining)
+
     async def _set_up_channels(self):
         """Set up channels listed in the config file."""
         self.channels.clear()
@@ -264,7 +373,7 @@ class BaseBot:
             active_online = channel_name in self.config.online_channels
             active_offline = channel_name in self.config.offline_channels
             await self._add_channel(channel_name, active_online, active_offline)
-            await self.irc.join(channel_name)  # type: ignore
+        await self.irc.join(*self.config.channels)  # type: ignore
 
     async def _add_channel(self, channel_name: str, active_online: bool, active_offline: bool):
         """Add a channel to the bot."""
@@ -273,78 +382,65 @@ class BaseBot:
 
     async def message_handler(self, msg: Message):
         """Process every message received from Twitch."""
-        if msg.type_ in {"002", "003", "004", "375", "372",  # ignored
-                        "376", "GLOBALUSERSTATE", "HOSTTARGET"}:
+        if msg.type_ in IGNORED_TYPES:
             return
-        handlers = {
-            "001": self._handle_001,
-            "CAP * ACK": self._handle_cap_ack,
-            "PING": self._handle_ping,
-            "RECONNECT": self._handle_reconnect,
-            "WHISPER": self._handle_whisper,
-            "353": self._handle_353,
-            "JOIN": self._handle_join,
-            "PART": self._handle_part,
-            "366": self._handle_366,
-            "NOTICE": self._handle_notice,
-            "USERSTATE": self._handle_userstate,
-            "ROOMSTATE": self._handle_roomstate,
-            "CLEARCHAT": self._handle_clearchat,
-            "CLEARMSG": self._handle_clearmsg,
-            "USERNOTICE": self._handle_usernotice,
-            "PRIVMSG": self._handle_privmsg  # any user-sent message
-            }
-        if (handler := handlers.get(msg.type_)):
-            if msg.type_ in {"001", "CAP * ACK", "PING", "RECONNECT", "WHISPER"}:
-                await handler(msg)
+        if (entry := self._handlers.get(msg.type_)):
+            handler, needs_channel, is_async = entry
+            if needs_channel:
+                args = (self.channels.get(msg.channel, None), msg)  # type: ignore
+            else:
+                args = (msg,)
+            # handlers with nothing to await are called directly to skip a coroutine hop
+            if is_async:
+                await handler(*args)
             else:
-                channel = self.channels.get(msg.channel, None)  # type: ignore
-                await handler(channel, msg)
+                handler(*args)
         elif self.config.rich_irc:
-            print(f"Unhandled IRC type: {msg} {msg.raw}")
+            self._log(f"Unhandled IRC type: {msg} {msg.raw}")
 
-    async def _handle_001(self, msg: LoginMessage):
+    def _handle_001(self, msg: LoginMessage):
         if not self.config.rich_irc:
             return
-        print(f'<[{color(msg.type_, RGB.ORANGE)}] {color("Login successful!", RGB.GREEN)}')
+        self._log(f'<[{COLORED_TYPES[msg.type_]}] {color("Login successful!", RGB.GREEN)}')
 
-    async def _handle_cap_ack(self, msg: CapabilitiesMessage):
+    def _handle_cap_ack(self, msg: CapabilitiesMessage):
         if self.config.capability and set(msg.capabilities) != set(self.config.capability):
             raise RuntimeError("Acquired capabilities do not match requested")
         if self.config.rich_irc:
-            print(f'<[{color(msg.type_, RGB.ORANGE)}] {", ".join(msg.capabilities)}')
+            self._log(f'<[{COLORED_TYPES[msg.type_]}] {", ".join(msg.capabilities)}')
 
     async def _handle_ping(self, msg: PingMessage):
         await self.irc.pong()  # type: ignore
         if self.config.rich_irc:
-            print(f'<[{color(msg.type_, RGB.ORANGE)}]')
+            self._log(f'<[{COLORED_TYPES[msg.type_]}]')
 
-    async def _handle_reconnect(self, msg: ReconnectMessage):
+    def _handle_reconnect(self, msg: ReconnectMessage):
         # server will disconnect for you, just clean up/save
         if self.config.rich_irc:
-            print(f'<[{color(msg.type_, RGB.ORANGE)}]')
+            self._log(f'<[{COLORED_TYPES[msg.type_]}]')
 
-    async def _handle_whisper(self, msg: WhisperMessage):
-        print(f'<[{color(msg.type_, RGB.ORANGE)}] ' \
-              f'{msg.from_} >> {msg.to}: {color(msg.message, SGR.YELLOW)}')
+    def _handle_whisper(self, msg: WhisperMessage):
+        self._log(f'<[{COLORED_TYPES[msg.type_]}] ' \
+                  f'{msg.from_} >> {msg.to}: {color(msg.message, SGR.YELLOW)}')
 
-    async def _handle_353(self, channel: BaseChannel, msg: NamesMessage):
+    def _handle_353(self, channel: BaseChannel, msg: NamesMessage):
         channel.userdata.users.update(set(msg.users))
 
-    async def _handle_join(self, channel: BaseChannel, msg: JoinMessage):
+    def _handle_join(self, channel: BaseChannel, msg: JoinMessage):
         channel.userdata.users.add(msg.user)
 
-    async def _handle_part(self, channel: BaseChannel, msg: PartMessage):
+    def _handle_part(self, channel: BaseChannel, msg: PartMessage):
         channel.userdata.users.discard(msg.user)
 
     async def _handle_366(self, channel: BaseChannel, msg: EndOfNamesMessage):
         # channel connection message (end of connected users list)
         channel.connected = True
-        output_366: str = f'Successfully connected to {color(f"#{channel.name}", SGR.BLUE)}! ' \
+        output_366: str = f'Successfully connected to {channel.colored_name}! ' \
                           f'{len(channel.userdata.users)} users connected.'
         if self.config.rich_irc:
-            output_366 = f'<[{color(msg.type_, RGB.ORANGE)}] {output_366}'
-        print(output_366)
+            output_366 = f'<[{COLORED_TYPES[msg.type_]}] {output_366}'
+        self._log(output_366)
+        self.flush_output()
         if not self.irc:
             raise RuntimeError("IRC client not connected")
         # migrated from handle_notice since /mods is no longer usable via irc
@@ -352,26 +448,26 @@ class BaseBot:
         if all(channel.connected for channel in self.channels.values()):
             if not (status_cmd := Command.get_by_name("status")):
                 raise RuntimeError("status command not found")
-            dummy_msg = ChatMessage('', '', '', '', '', {})
+            dummy_msg = ChatMessage('', '', '', '', '', raw_tags='')
             await status_cmd(BaseContext(self, dummy_msg, channel))
 
-    async def _handle_notice(self, channel: BaseChannel, msg: NoticeMessage):
+    def _handle_notice(self, channel: BaseChannel, msg: NoticeMessage):
         assert msg.message, f'Expected msg.message from "{msg.type_}"'
-        print(f'<[{color(msg.type_, RGB.ORANGE)}] ' \
-                f'<{color(f"#{channel.name}", SGR.BLUE)}> ' \
-                f'{msg.message} ({msg.tags["msg-id"]})')
+        self._log(f'<[{COLORED_TYPES[msg.type_]}] ' \
+                  f'<{channel.colored_name}> ' \
+                  f'{msg.message} ({msg.tags["msg-id"]})')
 
-    async def _handle_userstate(self, channel: BaseChannel, msg: UserstateMessage):
+    def _handle_userstate(self, channel: BaseChannel, msg: UserstateMessage):
         channel.mod = msg.tags["mod"] == "1"
 
-    async def _handle_roomstate(self, channel: BaseChannel, msg: RoomstateMessage):
+    def _handle_roomstate(self, channel: BaseChannel, msg: RoomstateMessage):
         if not self.config.rich_irc:
             return
         if (len(msg.tags) > 1
             and all(int(value) != 1 for value in msg.tags.values())
             and int(msg.tags["followers-only"]) == -1):
-            print(f'<[{color(msg.type_, RGB.ORANGE)}] ' \
-                  f'<{color(f"#{channel.name}", SGR.BLUE)}> Chat in default state.')
+            self._log(f'<[{COLORED_TYPES[msg.type_]}] ' \
+                      f'<{channel.colored_name}> Chat in default state.')
         else:
             output_roomstate: list[str] = []
             if len(msg.tags) == 1:
@@ -387,43 +483,43 @@ class BaseBot:
                         else:
                             mode = f"{tag} mode enabled."
                         output_roomstate.append(mode)
-            print(f'<[{color(msg.type_, RGB.ORANGE)}] ' \
-                  f'<{color(f"#{channel.name}", SGR.BLUE)}> ' \
-                  f'{" ".join(output_roomstate)}')
+            self._log(f'<[{COLORED_TYPES[msg.type_]}] ' \
+                      f'<{channel.colored_name}> ' \
+                      f'{" ".join(output_roomstate)}')
 
-    async def _handle_clearchat(self, channel: BaseChannel, msg: ClearchatMessage):
+    def _handle_clearchat(self, channel: BaseChannel, msg: ClearchatMessage):
         if msg.user:
             if "ban-duration" in msg.tags:
                 output_cc: str = f'User "{msg.user}" timed out for {msg.tags["ban-duration"]}s'
             else:
                 output_cc = f'User "{msg.user}" banned'
-            print(f'<[{color(msg.type_, RGB.ORANGE)}] ' \
-                  f'<{color(f"#{channel.name}", SGR.BLUE)}> {output_cc}')
+            self._log(f'<[{COLORED_TYPES[msg.type_]}] ' \
+                      f'<{channel.colored_name}> {output_cc}')
             if msg.user == self.config.username:
                 if "ban-duration" in msg.tags:
                     channel.messenger.timeout = (
                         channel.messenger.timeout+int(msg.tags["ban-duration"])+1)
                 else:
                     channel.messenger.timeout = -1
-                print(f'<{color(f"#{channel.name}", SGR.BLUE)}> ' \
-                      f'Timeout set to {msg.tags["ban-duration"]}.')
+                self._log(f'<{channel.colored_name}> ' \
+                          f'Timeout set to {msg.tags["ban-duration"]}.')
         else:
-            print(f'<[{color(msg.type_, RGB.ORANGE)}] ' \
-                  f'<{color(f"#{channel.name}", SGR.BLUE)}> ' \
-                  f'Chat was cleared by a moderator')
+            self._log(f'<[{COLORED_TYPES[msg.type_]}] ' \
+                      f'<{channel.colored_name}> ' \
+                      f'Chat was cleared by a moderator')
 
-    async def _handle_clearmsg(self, channel: BaseChannel, msg: ClearmsgMessage):
-        print(f'<[{color(msg.type_, RGB.ORANGE)}] <{color(f"#{channel.name}", SGR.BLUE)}> ' \
-              f'Message from "{msg.tags["login"]}" deleted: {msg.message}')
+    def _handle_clearmsg(self, channel: BaseChannel, msg: ClearmsgMessage):
+        self._log(f'<[{COLORED_TYPES[msg.type_]}] <{channel.colored_name}> ' \
+                  f'Message from "{msg.tags["login"]}" deleted: {msg.message}')
 
-    async def _handle_usernotice(self, channel: BaseChannel, msg: UsernoticeMessage):
-        system_message = msg.tags["system-msg"].replace(r"\s",' ')
+    def _handle_usernotice(self, channel: BaseChannel, msg: UsernoticeMessage):
+        system_message = msg.tags["system-msg"]
         if system_message:
             system_message += " - "
         login_user = msg.tags["login"] if "login" in msg.tags else ''
         notice_message = f": {msg.message}" if msg.message else ''
-        print(f'<[{color(msg.type_, RGB.ORANGE)}] <{color(f"#{channel.name}", SGR.BLUE)}> ' \
-              f'({msg.tags["msg-id"]}) {system_message}{login_user}{notice_message}')
+        self._log(f'<[{COLORED_TYPES[msg.type_]}] <{channel.colored_name}> ' \
+                  f'({msg.tags["msg-id"]}) {system_message}{login_user}{notice_message}')
 
     async def _handle_privmsg(self, channel: BaseChannel, msg: ChatMessage):
         # store/update user_id data
@@ -431,9 +527,9 @@ class BaseBot:
         if msg.user not in channel.uid_manager.users[user_id]:
             if channel.uid_manager.users[user_id] and channel.mod:
                 previous_names = channel.uid_manager.users[user_id]
-                printc(f'Name change detected: ' \
-                       f'{", ".join(previous_names)} >> {msg.user}', RGB.PINK)
-            channel.uid_manager.users[user_id].append(msg.user)
+                self._log(color(f'Name change detected: ' \
+                                f'{", ".join(previous_names)} >> {msg.user}', RGB.PINK))
+            channel.uid_manager.add_alias(user_id, msg.user)
 
         # update mod roles
         if msg.tags["mod"] == '1':
@@ -441,37 +537,32 @@ class BaseBot:
         else:
             channel.userdata.mods.discard(msg.user)
 
-        # log to console
         user_role = UserRole.from_message(self.ranks, msg)
-        name_display = msg.tags["display-name"] if "display-name" in msg.tags else msg.user
-        name_color = (get_name_color(msg.tags["color"][1:]) if msg.tags["color"] else RGB.GRAY)
-        colored_name_display = color(name_display, name_color)
-        if user_role & UserRole.SUB:
-            name_display = f"[SUB] {name_display}"
-            colored_name_display = f'[{color("SUB", SUBSCRIBER_COLOR)}] {colored_name_display}'
-        if user_role & UserRole.MOD:
-            name_display = f"[MOD] {name_display}"
-            colored_name_display = f'[{color("MOD", RGB.GREEN)}] {colored_name_display}'
-        elif user_role & UserRole.VIP:
-            name_display = f"[VIP] {name_display}"
-            colored_name_display = f'[{color("VIP", RGB.PINK)}] {colored_name_display}'
-
+        name_display = msg.tags.get("display-name") or msg.user
         unix = round(perf_counter()-self.start_time, 3)
-        timestamp_format = self.config.timestamp_format
-        match timestamp_format:
-            case 'uptime':
-                timestamp = read_time(unix, "stamp")
-            case '12h' | '24h':
-                date_time = datetime.fromtimestamp(int(msg.tags["tmi-sent-ts"])/1000)
-                time_format = "%I:%M:%S %p" if timestamp_format == '12h' else "%H:%M:%S"
-                timestamp = datetime.strftime(date_time, time_format)
-
-        if msg.message.startswith("/me"):
-            colored_message = f'{colored_name_display} {color(msg.message[4:], name_color)}'
-        else:
-            colored_message = f'{colored_name_display}: {color(msg.message, SGR.YELLOW)}'
-        print(f'    [{color(timestamp, SGR.CYAN)}] ' \
-              f'<{color(f"#{channel.name}", SGR.BLUE)}> {colored_message}')
+
+        # log to console
+        if self.config.rich_irc:
+            hex_color = msg.tags.get("color")
+            name_color = get_name_color(hex_color[1:]) if hex_color else RGB.GRAY
+            colored_name_display = (f'{ROLE_TAGS[user_role & ROLE_TAG_MASK]}'
+                                    f'{color(name_display, name_color)}')
+
+            timestamp_format = self.config.timestamp_format
+            match timestamp_format:
+                case 'uptime':
+                    timestamp = read_time(unix, "stamp")
+                case '12h' | '24h':
+                    date_time = datetime.fromtimestamp(int(msg.tags["tmi-sent-ts"])/1000)
+                    time_format = "%I:%M:%S %p" if timestamp_format == '12h' else "%H:%M:%S"
+                    timestamp = datetime.strftime(date_time, time_format)
+
+            if msg.message.startswith("/me"):
+                separator, colored_message = ' ', color(msg.message[4:], name_color)
+            else:
+                separator, colored_message = ': ', color(msg.message, SGR.YELLOW)
+            self._log(f'    [{color(timestamp, SGR.CYAN)}] <{channel.colored_name}> ' \
+                      f'{colored_name_display}{separator}{colored_message}')
 
         # update chat history
         if len(channel.history) == self.config.history_limit:
@@ -479,7 +570,9 @@ class BaseBot:
         channel.history.append({"unix": unix,
                                 "disp": name_display,
                                 "user": msg.user,
+                                "role": user_role,
                                 "message": msg.message})
-        channel.userdata.history[msg.user].append((unix, msg.message))
+        channel.userdata.history_unix[msg.user].append(unix)
+        channel.userdata.history_msg[msg.user].append(msg.message)
 
         await Command.check_command(self, msg)
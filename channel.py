@@ -1,14 +1,14 @@
 """Class for encapsulating per-channel operations."""
 from __future__ import annotations
-from asyncio import Queue, sleep
-from collections import defaultdict
+from asyncio import Queue, sleep, to_thread
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
+from heapq import heappop, heappush
 import json
 import os
-import re
 from typing import TypedDict, TYPE_CHECKING
 
-from colors import RGB, printc
+from colors import SGR, RGB, printc, color
 
 if TYPE_CHECKING:
     from bot import BaseBot
@@ -78,6 +78,8 @@ class UIDManager:
             os.mkdir(f"{self.path}")
         self.channel = channel
         self.users = defaultdict(list)
+        # IDs with more than one username, in the order they were first seen changing names
+        self._namechangers: dict[str, None] = {}
         self.get_users()
 
     def get_users(self):
@@ -85,6 +87,8 @@ class UIDManager:
         try:
             with open(f"{self.path}/users.json", 'r', encoding="UTF-8") as file:
                 self.users = defaultdict(list, json.load(file))
+            self._namechangers = dict.fromkeys(
+                uid for uid, names in self.users.items() if len(names) > 1)
         except (FileNotFoundError, json.JSONDecodeError):
             printc(f"Missing or broken users.json for #{self.channel}, " \
                    f"creating a new one.", RGB.YELLOW)
@@ -95,24 +99,40 @@ class UIDManager:
         """Get all known aliases of a username. If none are found, return just the username."""
         return tuple(set(self.users.get(username, [])) | {username})
 
-    def save_users(self):
-        """Update JSON files containing structured username data."""
-        with open(f"{self.path}/users.json", 'w', encoding="UTF-8") as file:
-            file.write(json.dumps(self.users, indent=4, separators=(',', ': ')))
+    def add_alias(self, user_id: str, username: str):
+        """Record a new username for a user ID."""
+        self.users[user_id].append(username)
+        if len(self.users[user_id]) > 1:
+            self._namechangers[user_id] = None
+
+    async def save_users(self):
+        """
+        Update JSON files containing structured username data.\n
+        Serialization happens up front so the files can be written off the event loop.
+        """
+        users_json = json.dumps(self.users, indent=4, separators=(',', ': '))
         # namechanges file is just for quick reference
-        namechanges = [names for names in self.users.values() if len(names) > 1]
+        namechanges = '\n'.join([", ".join(self.users[user_id]) for user_id in self._namechangers])
+        await to_thread(self._write_users, users_json, namechanges)
+
+    def _write_users(self, users_json: str, namechanges: str):
+        """Write serialized username data to disk."""
+        with open(f"{self.path}/users.json", 'w', encoding="UTF-8") as file:
+            file.write(users_json)
         with open(f"{self.path}/namechanges.txt", 'w', encoding="UTF-8") as file:
-            file.write('\n'.join([", ".join(names) for names in namechanges]))
+            file.write(namechanges)
 
 
 @dataclass(slots=True)
 class UserData:
-    """Per-channel data pertaining to users in chat."""
-    UserHistoryMsg = tuple[float, str]
-
+    """
+    Per-channel data pertaining to users in chat.\n
+    Message history is stored as parallel timestamp and message deques per user.
+    """
     users: set[str]
     mods: set[str]
-    history: dict[str, list[UserHistoryMsg]]
+    history_unix: dict[str, deque[float]]
+    history_msg: dict[str, deque[str]]
     cooldowns: dict[str, dict[str, float]]
 
     def break_pings(self, message: str) -> str:
@@ -122,13 +142,12 @@ class UserData:
         """
         words = message.split()
         for i, word in enumerate(words):
-            word = word.strip()
-            if (match := re.match(r"@?(\w+),?", word)):
-                print(word)
-                if match[1].lower() in self.users:
-                    index = 2 if word.startswith('@') else 1
-                    print(index, f'{word[:index]}|{word[index:]}')
-                    words[i] = f'{word[:index]}|{word[index:]}'
+            start = 1 if word.startswith('@') else 0
+            end = start
+            while end < len(word) and (word[end].isalnum() or word[end] == '_'):
+                end += 1
+            if end > start and word[start:end].lower() in self.users:
+                words[i] = f'{word[:start+1]}|{word[start+1:]}'
         return ' '.join(words)
 
 
@@ -142,16 +161,21 @@ class BaseChannel:
             unix: float
             disp: str
             user: str
+            role: int
             message: str
 
         self.name = name
+        self.colored_name = color(f"#{name}", SGR.BLUE)
         self.active, self.live, self.mod = True, True, False
         self.active_online, self.active_offline = active_online, active_offline
         self.cooldowns: dict[str, float] = {}
-        self.history: list[HistoryMsg] = []
+        # (expiry, command name, user or '' for global) for every cooldown set, soonest first
+        self.cooldown_heap: list[tuple[float, str, str]] = []
+        self.history: deque[HistoryMsg] = deque()
         self.messenger = Messenger(bot, self)
         self.uid_manager = UIDManager(usernames_directory, name)
-        self.userdata = UserData(set(), set(), defaultdict(list), defaultdict(dict))
+        self.userdata = UserData(set(), set(), defaultdict(deque), defaultdict(deque),
+                                 defaultdict(dict))
         self.connected = False
 
     async def send(self, message: str):
@@ -168,13 +192,27 @@ class BaseChannel:
             self.cooldowns[command_name] = length
         else:
             self.userdata.cooldowns[user][command_name] = length
+        heappush(self.cooldown_heap, (length, command_name, user or ''))
+
+    def expire_cooldowns(self, now: float):
+        """Remove cooldowns that have run out, only visiting those due to expire."""
+        while self.cooldown_heap and self.cooldown_heap[0][0] <= now:
+            expiry, command_name, user = heappop(self.cooldown_heap)
+            cooldowns = self.userdata.cooldowns.get(user) if user else self.cooldowns
+            # skip entries superseded by a later cooldown for the same command
+            if cooldowns is not None and cooldowns.get(command_name) == expiry:
+                del cooldowns[command_name]
+                if user and not cooldowns:
+                    del self.userdata.cooldowns[user]
 
     def purge_oldest_message(self):
         """Remove the oldest message and its data completely from the message history."""
-        pop_msg = self.history.pop(0)
-        self.userdata.history[pop_msg["user"]].pop(0)
-        if not self.userdata.history[pop_msg["user"]]:
-            del self.userdata.history[pop_msg["user"]]
+        user = self.history.popleft()["user"]
+        self.userdata.history_unix[user].popleft()
+        self.userdata.history_msg[user].popleft()
+        if not self.userdata.history_unix[user]:
+            del self.userdata.history_unix[user]
+            del self.userdata.history_msg[user]
 
     @property
     def activity_allowed(self) -> bool:
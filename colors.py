@@ -1,36 +1,45 @@
 """Implementation of console colorization via ANSI escape sequences."""
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from enum import Enum
 import os
-from typing import Any
+from string import hexdigits
+from typing import Any, Callable
 
 
 os.system("color")
 
+RESET = "\33[0m"
+HEX_DIGITS = frozenset(hexdigits)
+
 
 class ANSIColor(ABC):
-    """A color implemented via ANSI escape sequence."""
+    """
+    A color implemented via ANSI escape sequence.\n
+    Subclasses build their foreground and background sequences once on init.
+    """
+    _fg: str
+    _bg: str
+
     @abstractmethod
     def __init__(self):
         pass
 
-    @abstractmethod
-    def _as_sequence(self, is_background: bool = False) -> str:
-        """ANSI escape sequence for a color."""
-
     def color(self, content: Any, is_background: bool = False) -> str:
         """Colorize a string using ANSI escape sequences."""
-        return f"{self._as_sequence(is_background)}{str(content)}\33[0m"
+        return f"{self._bg if is_background else self._fg}{content}{RESET}"
+
+    @staticmethod
+    def combine(fg_color: ANSIColor, bg_color: ANSIColor) -> str:
+        """Single ANSI escape sequence setting both a foreground and background color."""
+        return f"{fg_color._fg[:-1]};{bg_color._bg[2:]}"
 
 
 class SGRColor(ANSIColor):
     """An ANSI color that uses a preset Select Graphic Rendition (SGR) parameter."""
     def __init__(self, value: int):
         self.value = value
-
-    def _as_sequence(self, is_background: bool = False) -> str:
-        return f"\33[{self.value + (10 if is_background else 0)}m"
+        self._fg = f"\33[{value}m"
+        self._bg = f"\33[{value + 10}m"
 
 
 class RGBColor(ANSIColor):
@@ -39,25 +48,24 @@ class RGBColor(ANSIColor):
         self.red = red
         self.green = green
         self.blue = blue
+        self._fg = f"\33[38;2;{red};{green};{blue}m"
+        self._bg = f"\33[48;2;{red};{green};{blue}m"
 
     def __iter__(self):
         return iter(self.tuple)
 
-    def _as_sequence(self, is_background: bool = False) -> str:
-        color_strings = tuple(str(value) for value in self)
-        method = 38 + (10 if is_background else 0)
-        return f"\33[{method};2;{';'.join(color_strings)}m"
-
     @classmethod
     def from_hex(cls, hex_string: str) -> RGBColor:
         """Convert a hex string to an RGB color."""
-        if len(hex_string) not in {3, 6}:
+        if len(hex_string) not in (3, 6):
             raise ValueError("Hex string must be 3 or 6 characters long")
-        if len(hex_string) == 3:
-            hex_string = ''.join([char*2 for char in hex_string])
-        return cls(int(hex_string[0:2], 16),
-                   int(hex_string[2:4], 16),
-                   int(hex_string[4:6], 16))
+        # int() would also accept signs, whitespace, underscores and a 0x prefix
+        if not HEX_DIGITS.issuperset(hex_string):
+            raise ValueError("Hex string must only contain hexadecimal digits")
+        value = int(hex_string, 16)
+        if len(hex_string) == 3:  # duplicate each digit, e.g. 0xABC -> 0xAABBCC
+            value = (value & 0xF00) * 0x1100 | (value & 0x0F0) * 0x0110 | (value & 0x00F) * 0x0011
+        return cls(value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF)
 
     @property
     def tuple(self):
@@ -65,17 +73,7 @@ class RGBColor(ANSIColor):
         return (self.red, self.green, self.blue)
 
 
-class Palette(Enum):
-    """A collection of colors implementing ANSI escape sequences."""
-    def __getitem__(self, index: int | slice):
-        return self.value[index]
-
-    def color(self, content: Any, is_background: bool = False) -> str:
-        """Colorize a string using ANSI escape sequences."""
-        return self.value.color(content, is_background)
-
-
-class SGR(Palette):
+class SGR:
     """
     Default SGR colors for console colorization.\n
     Dark colors are available but mostly undesirable.
@@ -100,7 +98,7 @@ class SGR(Palette):
     WHITE = SGRColor(97)
 
 
-class RGB(Palette):
+class RGB:
     """
     Common RGB colors.\n
     Dark colors are available but mostly undesirable.
@@ -128,72 +126,81 @@ class RGB(Palette):
 
 
 MIN_COLOR, MAX_COLOR = (255, 85, 85), (85, 85, 255)
+# colors for each whole percent along the scale from MIN_COLOR to MAX_COLOR
+SCALE_COLORS = tuple(
+    RGBColor(*(x+int((y-x)*(percent/100)) for x, y in zip(MIN_COLOR, MAX_COLOR)))
+    for percent in range(101))
 
-def color(content: Any, fg_color: SGR | RGB | RGBColor,
-          bg_color: SGR | RGB | RGBColor | None = None) -> str:
+def color(content: Any, fg_color: ANSIColor, bg_color: ANSIColor | None = None) -> str:
     """Colorize text using ANSI escape sequences via SGR or RGB formats."""
     if bg_color is None:
         return fg_color.color(content)
-    fg_color = fg_color.value if isinstance(fg_color, RGB) else fg_color
-    bg_color = bg_color.value if isinstance(bg_color, RGB) else bg_color
-    if (type(fg_color), type(bg_color)) not in {(SGR, SGR), (RGBColor, RGBColor)}:
+    if type(fg_color) is not type(bg_color) or not isinstance(fg_color, (SGRColor, RGBColor)):
         raise TypeError("Mismatched color types")
-    return bg_color.color(fg_color.color(content), is_background=True)
+    return f"{ANSIColor.combine(fg_color, bg_color)}{content}{RESET}"
 
-def printc(content: str, fg_color: SGR | RGB | RGBColor,
-           bg_color: SGR | RGB | RGBColor | None = None):
+def printc(content: str, fg_color: ANSIColor, bg_color: ANSIColor | None = None):
     """Shorthand for printing a fully-colored string."""
     print(color(content, fg_color, bg_color))
 
-def readable(rgb: RGB | RGBColor) -> RGBColor:
+def _brighten(value: int) -> int:
+    """Step a single RGB value towards 255, capped so it stays in range."""
+    delta = 255 - value
+    if delta == 100:  # the step size diverges here, so go straight to the cap
+        return 255
+    return min(255, int(value + delta * 0.01 * ((10**6) / ((delta - 100)**2)) / 100))
+
+def readable(rgb: RGBColor) -> RGBColor:
     """
     Adjust RGB values to be readable in the terminal. \n
     Higher values increase faster to preserve saturation.
     """
-    rgb = rgb.value if isinstance(rgb, RGB) else rgb
-    while sum(map(lambda x: x**2, rgb)) <= 50000:
-        delta = tuple(255-x for x in rgb)
-        converted_delta = map(lambda x: x * 0.01 * ((10**6) / ((x - 100)**2)) / 100, delta)
-        intermediate = list(zip(rgb, converted_delta))
-        rgb = RGBColor(*map(lambda pair: int(sum(pair)), intermediate))
-    return rgb
+    red, green, blue = rgb.tuple
+    while red*red + green*green + blue*blue <= 50000:
+        red, green, blue = _brighten(red), _brighten(green), _brighten(blue)
+    return RGBColor(red, green, blue)
+
+def _colorize_item(item: Any, item_color: ANSIColor) -> str:
+    """Colorize a single container item, quoting strings."""
+    return color(f"'{item}'" if isinstance(item, str) else item, item_color)
+
+def _colorize_sequence(value: list | tuple | set, item_color: ANSIColor,
+                       delimiter: tuple[str, str]) -> str:
+    """Colorize the items of a list, tuple or set."""
+    items = ', '.join([_colorize_item(item, item_color) for item in value])
+    return f"{delimiter[0]}{items}{delimiter[1]}"
+
+def _colorize_dict(value: dict) -> str:
+    """Colorize the keys and values of a dictionary, omitting empty values."""
+    items = [f"{_colorize_item(key, RGB.ORANGE)}: {_colorize_item(item, SGR.BLUE)}" if item
+             else _colorize_item(key, RGB.ORANGE) for key, item in value.items()]
+    return f"{{{', '.join(items)}}}"
+
+CONTAINER_COLORIZERS: dict[type, Callable[[Any], str]] = {
+    list: lambda value: _colorize_sequence(value, RGB.ORANGE, ('[', ']')),
+    tuple: lambda value: _colorize_sequence(value, RGB.YELLOW, ('(', ')')),
+    set: lambda value: _colorize_sequence(value, RGB.PINK, ('{', '}')),
+    dict: _colorize_dict
+    }
 
 def colorize(value: None | bool | list | tuple | set | dict | int | float,
              invert: bool = False, scale: tuple[int, int] | None = None) -> str:
     """Convert a value to a type-dependent colored string representation."""
+    if (colorize_container := CONTAINER_COLORIZERS.get(type(value))):
+        return colorize_container(value)
     match value:
         case None:
             return "None"
         case bool():
             return color(value, RGB.GREEN) if invert ^ value else color(value, RGB.RED)
-        case list() | tuple() | set() | dict():
-            items, original_type = [], type(value)
-            (key_color, value_color), delimiter = {
-                list: ((RGB.ORANGE, None), ('[', ']')),
-                tuple: ((RGB.YELLOW, None), ('(', ')')),
-                set: ((RGB.PINK, None), ('{', '}')),
-                dict: ((RGB.ORANGE, SGR.BLUE), ('{', '}'))
-                }[original_type]
-            if isinstance(value, dict):
-                value = list(value.items())
-            for item in value:
-                new_key, new_value = item if isinstance(item, tuple) else (item, None)
-                new_key = (color(f"'{new_key}'", key_color)
-                           if isinstance(new_key, str) else color(new_key, key_color))
-                if new_value:
-                    new_value = (color(f"'{new_value}'", value_color)
-                                 if isinstance(new_value, str) else color(new_value, value_color))
-                items.append(f'{new_key}{f": {new_value}" if new_value else ""}')
-            return f"{delimiter[0]}{', '.join(items)}{delimiter[1]}"
         case int() | float():
             if scale is None:
                 raise ValueError("Cannot colorize number without range")
             if not (isinstance(scale, tuple) and len(scale) == 2):
                 raise ValueError("Range must be tuple of size 2 (min, max) [inclusive]")
-            if value not in range(scale[0], scale[1]+1):  # type: ignore
+            low, high = scale
+            if not low <= value <= high:
                 return color(value, RGB.LIGHT_GRAY)
-            percent = int((value-scale[0]) / (scale[1]-scale[0]) * 100)  # type: ignore
-            rgb_diff = tuple(x-y for x, y in zip(MAX_COLOR, MIN_COLOR))
-            final_color = tuple(x+int(y*(percent/100)) for x, y in zip(MIN_COLOR, rgb_diff))
-            return color(value, RGBColor(*final_color))
+            percent = int((value-low) / (high-low) * 100)
+            return color(value, SCALE_COLORS[percent])
     raise TypeError(f"Colorization of type {type(value).__name__} not supported")
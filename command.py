@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from enum import IntEnum, IntFlag, Flag
 from string import printable as PRINTABLE
 import time
+import unicodedata
 from typing import Callable, TYPE_CHECKING
 
 from channel import BaseChannel
@@ -14,6 +15,27 @@ if TYPE_CHECKING:
     from bot import BaseBot, Ranks
 
 
+class ControlCharTable(dict):
+    """
+    Translation table removing non-printable characters from arguments.\n
+    Entries are filled in the first time each character is seen. Besides ASCII control
+    characters this drops Unicode control, format and unassigned codepoints, such as the
+    U+E0000 tag Twitch clients append to bypass duplicate message checks.
+    The zero width joiner is kept so that joined emoji stay intact.
+    """
+    def __missing__(self, code: int) -> int | None:
+        char = chr(code)
+        if code < 128:
+            keep = char in PRINTABLE
+        else:
+            keep = char == '\u200d' or unicodedata.category(char) not in {"Cc", "Cf", "Cn"}
+        self[code] = code if keep else None
+        return self[code]
+
+
+CONTROL_CHARS = ControlCharTable()
+
+
 class UserRole(IntFlag):
     """Roles for command permissions."""
     NONE = 0
@@ -24,27 +46,29 @@ class UserRole(IntFlag):
     OWNER = 1 << 4
 
     def __str__(self):
-        output = [role.name.lower() for role in reversed(UserRole)  # type: ignore
-                  if role and self & role]
-        return '+'.join(output)
+        return '+'.join([name for role, name in ROLE_NAMES if self & role])
 
     @classmethod
     def from_message(cls, ranks: Ranks, msg: ChatMessage) -> UserRole:
         """Get user role from a message."""
-        role = cls.NONE
-        if msg.user == ranks.owner:
-            role |= cls.OWNER
-        if msg.user in ranks.admins:
+        user, tags = msg.user, msg.tags
+        role = cls.OWNER if user == ranks.owner else cls.NONE
+        if user in ranks.admins:
             role |= cls.ADMIN
-        if msg.tags["mod"] == '1':
+        if tags.get("mod") == '1':
             role |= cls.MOD
-        elif msg.tags["user-type"] == "vip":
+        elif tags.get("user-type") == "vip":
             role |= cls.VIP
-        if msg.tags["subscriber"] == '1':
+        if tags.get("subscriber") == '1':
             role |= cls.SUB
         return role
 
 
+# display names of each single role, highest first
+ROLE_NAMES: tuple[tuple[UserRole, str], ...] = tuple(
+    (role, role.name.lower()) for role in reversed(UserRole) if role)  # type: ignore
+
+
 class DenialReason(Flag):
     """Reasons for denied command execution."""
     NONE = 0
@@ -64,14 +88,23 @@ class CommandPerm(IntEnum):
     OWNER = 1 << 4
 
     def __str__(self):
-        return self.name.lower()
+        return PERM_NAMES[self]
 
     def check_role(self, role: UserRole) -> DenialReason:
         """Check if a user has permission to trigger a command."""
-        if role & UserRole.OWNER:
-            return DenialReason.NONE
-        allowed = role & UserRole.SUB if self == CommandPerm.SUB else role >= self
-        return DenialReason.NONE if allowed else DenialReason.PERMISSION
+        required = PERM_ROLES[self]
+        return DenialReason.NONE if not required or role & required else DenialReason.PERMISSION
+
+
+PERM_NAMES: dict[CommandPerm, str] = {perm: perm.name.lower() for perm in CommandPerm}
+
+# roles allowed to use each permission level (0 means anyone), the owner is always allowed;
+# sub commands need the sub role itself, other levels accept that role or any higher one
+PERM_ROLES: dict[CommandPerm, int] = {
+    perm: (0 if perm == CommandPerm.NONE
+           else UserRole.SUB | UserRole.OWNER if perm == CommandPerm.SUB
+           else sum(role for role in UserRole if role >= perm))
+    for perm in CommandPerm}
 
 
 @dataclass(slots=True)
@@ -102,6 +135,20 @@ class Parameter:
 class Parameters:
     """Handler for multiple command parameters."""
     entries: list[Parameter | str]
+    min_args: int = field(init=False)
+    max_args: int = field(init=False)
+    split_limit: int = field(init=False)
+
+    def __post_init__(self):
+        self.min_args = len(tuple(param for param in self.entries
+                                  if (isinstance(param, Parameter) and param.required)
+                                  or isinstance(param, str)))
+        self.max_args = len(self.entries)
+        # a remainder parameter takes the rest of the string, otherwise split fully
+        if self.entries and isinstance(self.entries[-1], Parameter) and self.entries[-1].remainder:
+            self.split_limit = len(self.entries) - 1
+        else:
+            self.split_limit = -1
 
     def parse_args(self, arg_string: str | None, role: UserRole) -> dict[str, str]:
         """Parse matched command arguments into a dictionary."""
@@ -109,22 +156,14 @@ class Parameters:
         if not self.entries:
             return matched
         if not arg_string:
-            if not any(param.required if isinstance(param, Parameter) else True
-                       for param in self.entries):
+            if not self.min_args:
                 return matched
             raise ArgumentError("No argument(s) provided")
-        if isinstance(self.entries[-1], Parameter) and self.entries[-1].remainder:
-            args = arg_string.strip().split(' ', len(self.entries)-1)
-        else:
-            args = arg_string.strip().split(' ')
-        min_args = len(tuple(param for param in self.entries
-                             if (isinstance(param, Parameter) and param.required)
-                             or isinstance(param, str)))
-        max_args = len(self.entries)
-        if len(args) not in range(min_args, max_args+1):
-            raise ArgumentError(f"Too few/many arguments ({min_args}-{max_args} required)")
-        for i, arg in enumerate(args):
-            param = self.entries[i]
+        args = arg_string.strip().split(' ', self.split_limit)
+        if not self.min_args <= len(args) <= self.max_args:
+            raise ArgumentError(f"Too few/many arguments " \
+                                f"({self.min_args}-{self.max_args} required)")
+        for param, arg in zip(self.entries, args):
             if isinstance(param, str):
                 if arg != param:
                     raise ArgumentError("Format error in argument")
@@ -147,7 +186,8 @@ class Parameters:
             return Parameters(params)
         # <required> [optional] <perm:parameter> <option=this|that> <remainder+>
         roles = {str(perm): perm for perm in CommandPerm}
-        for i, clause in enumerate(syntax.split()):
+        clauses = syntax.split()
+        for i, clause in enumerate(clauses):
             if clause.startswith(('<', '[')) and clause.endswith(('>', ']')):
                 parameter = Parameter()
                 if clause.startswith('<'):
@@ -163,7 +203,7 @@ class Parameters:
                     parameter.name, tag = tag.split('=', 1)
                     parameter.options = set(tag.split('|'))
                 elif '+' in tag:
-                    if i != len(syntax.split()) - 1:
+                    if i != len(clauses) - 1:
                         raise ParameterError("Remainder parameter must be last in the syntax")
                     parameter.remainder, parameter.name = True, tag[:-1]
                 else:
@@ -183,6 +223,8 @@ class Command:
     command by awaiting `Command.commands[name]()`.
     """
     commands: dict[str, Command] = {}
+    triggers: dict[str, Command] = {}
+    _unique: list[Command] = []  # each command once, in registration order
     default_prefix: str = '!'
 
     def __init__(self, func: Callable, name: str, syntax: str | None, desc: str,
@@ -202,9 +244,11 @@ class Command:
         self.params: Parameters = Parameters.from_syntax(syntax)
         self.disabled_channels: set[str] = set()
 
+        Command._unique.append(self)
         Command.commands[self.name] = self
         for alias in self.aliases:
             Command.commands[alias] = self
+        self._register_triggers()
 
     def __str__(self):
         syntax = f" {self.syntax}" if self.syntax else ''
@@ -215,6 +259,16 @@ class Command:
     async def __call__(self, *args, **kwargs):
         await self.func(*args, **kwargs)
 
+    def _register_triggers(self):
+        """
+        Map the triggers for the command's name and aliases to the command.\n
+        Also caches the command's main trigger, so this reruns whenever the prefix changes.
+        """
+        prefix = self.prefix if self.prefix is not None else Command.default_prefix
+        self._trigger = f"{prefix}{self.name}"
+        for name in (self.name, *self.aliases):
+            Command.triggers[f"{prefix}{name}"] = self
+
     def toggle(self, active: bool, channel: str | None = None):
         """Toggles a command globally or per-channel."""
         if channel is None:
@@ -233,14 +287,13 @@ class Command:
         Inherits lengths from the command by default, but
         can be overridden using `global_cd` and `user_cd`.
         """
+        now = time.perf_counter()
         if self.global_cd or global_cd:
-            channel.set_cooldown(
-                self.name, time.perf_counter() + (global_cd or self.global_cd))
+            channel.set_cooldown(self.name, now + (global_cd or self.global_cd))
         if (self.user_cd
             or (user_cd and (global_cd and user_cd > global_cd
                              or user_cd > self.global_cd))):
-            channel.set_cooldown(
-                self.name, time.perf_counter() + (user_cd or self.user_cd), msg.user)
+            channel.set_cooldown(self.name, now + (user_cd or self.user_cd), msg.user)
 
     def check_cooldowns(self, channel: BaseChannel, msg: ChatMessage) -> DenialReason:
         """Check if a command has any cooldown currently active."""
@@ -256,12 +309,13 @@ class Command:
         """Handle various reasons for the execution of a command being rejected."""
         if reason & DenialReason.BLACKLIST:
             return
+        now = time.perf_counter()
         if reason & DenialReason.GLOBAL_COOLDOWN:
-            cooldown = int(channel.cooldowns[self.name] - time.perf_counter())
+            cooldown = int(channel.cooldowns[self.name] - now)
             printc(f'Command "{self.name}" still on cooldown ' \
                    f'for {cooldown} seconds.', RGB.YELLOW)
         if reason & DenialReason.USER_COOLDOWN:
-            cooldown = int(channel.userdata.cooldowns[username][self.name] - time.perf_counter())
+            cooldown = int(channel.userdata.cooldowns[username][self.name] - now)
             printc(f'Command "{self.name}" still on cooldown ' \
                    f'for user "{username}" for {cooldown} seconds.', RGB.YELLOW)
         if reason & DenialReason.PERMISSION and not self.hide:
@@ -271,7 +325,7 @@ class Command:
                       channel: BaseChannel, arg_string: str | None):
         """Execute the code in the command's function, handling arguments and exceptions."""
         if arg_string is not None:
-            args = ''.join(filter(lambda x: x in PRINTABLE, arg_string)).strip()
+            arg_string = arg_string.translate(CONTROL_CHARS).strip()
         role = UserRole.from_message(bot.ranks, msg)
         try:
             args = self.params.parse_args(arg_string, role)
@@ -288,6 +342,9 @@ class Command:
     def set_prefix(cls, prefix: str):
         """Change the default prefix for all commands without custom prefixes."""
         cls.default_prefix = prefix
+        cls.triggers.clear()
+        for cmd in cls._unique:
+            cmd._register_triggers()
 
     @classmethod
     def get_by_name(cls, name: str) -> Command | None:
@@ -303,8 +360,7 @@ class Command:
         Get Command instance from command trigger.
         If the command doesn't exist, return `None`.
         """
-        return next((cmd for cmd in Command.commands.values()
-                     if cmd.trigger == trigger), None)
+        return cls.triggers.get(trigger)
 
     @classmethod
     def command(cls, name: str, syntax: str | None = None,
@@ -330,6 +386,7 @@ class Command:
         start, arg_string = parts if len(parts) == 2 else (parts[0], None)
         if ((cmd := Command.get_by_trigger(start)) and cmd.active
             and msg.channel not in cmd.disabled_channels):
+            bot.flush_output()  # commands print directly, so write buffered chat lines first
             role = UserRole.from_message(bot.ranks, msg)
             if (reason := (cmd.check_cooldowns(channel, msg)
                            | cmd.perm.check_role(role)
@@ -341,8 +398,7 @@ class Command:
     @property
     def trigger(self) -> str:
         """The string used to call a function in a chat message."""
-        prefix = self.prefix if self.prefix is not None else Command.default_prefix
-        return f"{prefix}{self.name}"
+        return self._trigger
 
 
 class ParameterError(Exception):
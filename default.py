@@ -1,37 +1,41 @@
 """Default bot functionality that persists across bot applications."""
 # pylint: disable=missing-function-docstring
-from collections import defaultdict
+from asyncio import gather, to_thread
 from time import perf_counter
 
 import requests
 
 from bot import BaseBot
-from colors import SGR, RGB, printc, color, colorize
+from colors import RGB, printc, colorize
 from command import CommandPerm, Command, ArgumentError, BaseContext
 from timer_ import Timer
 
 
+ALLOWED_PREFIXES = r"!#$%&'()*+,-:;<=>?@[\]^_`{|}~"
+ALLOWED_PREFIX_SET = frozenset(ALLOWED_PREFIXES)
+
+
 # TIMERS - background management
 
 @Timer.timer("check_live_status", interval=30)
 async def check_live_status(bot: BaseBot):
     """Update live status for all connected channels."""
-    for channel in bot.channels.values():
-        live_status = requests.get(f"https://beta.decapi.me/twitch/uptime" \
-                                   f"/{channel.name}?offline_msg=OFFLINE", timeout=1).text
+    channels = list(bot.channels.values())
+    # requests blocks, so run the lookups in worker threads to poll all channels at once
+    live_statuses = await gather(*(to_thread(get_uptime, channel.name) for channel in channels),
+                                 return_exceptions=True)
+    for channel, live_status in zip(channels, live_statuses):
+        if isinstance(live_status, Exception):
+            printc(f"Live status check failed for #{channel.name}: {live_status!r}", RGB.YELLOW)
+            continue
         channel.live = live_status != "OFFLINE"
 
 @Timer.timer("update_command_cooldowns", interval=1)
 async def update_command_cooldowns(bot: BaseBot):
     """Update command cooldowns to remove those that expired."""
+    now = perf_counter()
     for channel in bot.channels.values():
-        channel.cooldowns = {
-            k: v for k, v in channel.cooldowns.items() if v-perf_counter() > 0}
-        for username, cooldowns in channel.userdata.cooldowns.items():
-            channel.userdata.cooldowns[username] = {
-                k: v for k, v in cooldowns.items() if v-perf_counter() > 0}
-        channel.userdata.cooldowns = defaultdict(dict,
-            {k: v for k, v in channel.userdata.cooldowns.items() if v})
+        channel.expire_cooldowns(now)
 
 @Timer.timer("reset_sent", interval=30)
 async def reset_sent(bot: BaseBot):
@@ -43,11 +47,16 @@ async def reset_sent(bot: BaseBot):
 async def save_uids(bot: BaseBot):
     """Save all username data to file."""
     for channel in bot.channels.values():
-        channel.uid_manager.save_users()
+        await channel.uid_manager.save_users()
 
 
 # FUNCTIONS - helpers
 
+def get_uptime(channel_name: str) -> str:
+    """Get a channel's stream uptime, or "OFFLINE" if it is not live."""
+    return requests.get(f"https://beta.decapi.me/twitch/uptime" \
+                        f"/{channel_name}?offline_msg=OFFLINE", timeout=1).text
+
 
 # COMMANDS - interactivity
 
@@ -66,13 +75,11 @@ async def toggle_bot(ctx: BaseContext):
 @Command.command("cmds", None, "List all commands in chat.", global_cd=10)
 async def show_commands(ctx: BaseContext):
     command_displays = []
-    cmds = list(Command.commands.values())
-    for cmd in cmds:
+    # pylint: disable-next=protected-access
+    for cmd in Command._unique:
         if cmd.hide:
             continue
-        command_display = cmd.trigger
-        if not cmd.active:
-            command_display = f"~{command_display}"
+        command_display = cmd.trigger if cmd.active else f"~{cmd.trigger}"
         if cmd.perm:
             command_display = f"{command_display} ({cmd.perm})"
         command_displays.append(command_display)
@@ -89,7 +96,7 @@ async def command_help(ctx: BaseContext):
 async def list_statuses(ctx: BaseContext):
     printc("[BOT STATUS]", RGB.PINK)
     for channel in ctx.bot.channels.values():
-        print(f'    <{color(f"#{channel.name}", SGR.BLUE)}> - ' \
+        print(f'    <{channel.colored_name}> - ' \
               f'Live status: {colorize(channel.live)}, ' \
               f'Mod status: {colorize(channel.mod)}, ' \
               f'Locally active: {colorize(channel.active)}')
@@ -134,9 +141,8 @@ async def default_prefix(ctx: BaseContext):
     if "prefix" not in ctx.args:
         await ctx.channel.send(f'Current command prefix is "{Command.default_prefix}"')
         return
-    allowed_prefixes = r"!#$%&'()*+,-:;<=>?@[\]^_`{|}~"
-    if ctx.args["prefix"] not in allowed_prefixes:
-        raise ArgumentError(rf"Invalid prefix, choose from {allowed_prefixes}")
+    if ctx.args["prefix"] not in ALLOWED_PREFIX_SET:
+        raise ArgumentError(rf"Invalid prefix, choose from {ALLOWED_PREFIXES}")
     Command.set_prefix(ctx.args["prefix"])
     await ctx.channel.send(f'Default command prefix updated to "{ctx.args["prefix"]}".')
 
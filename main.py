@@ -1,20 +1,17 @@
 """Custom bot functionality and actual bot execution."""
-# pylint: disable=unused-import,unused-argument,redefined-outer-name
+# pylint: disable=unused-argument,redefined-outer-name
 from __future__ import annotations
-from dataclasses import dataclass, fields
-import importlib
-import json
+from dataclasses import dataclass
 from typing import Type
 
-from dotenv import dotenv_values
-
 from bot import BaseConfig, BaseBot
 from channel import BaseChannel
-from colors import printc, RGB, colorize
-from command import UserRole, BaseContext, Command, CommandPerm, ArgumentError
-from timer_ import Timer
-
-importlib.import_module("default")
+# helpers kept importable here for writing custom commands and timers
+from colors import printc, RGB, colorize  # pylint: disable=unused-import
+from command import (  # pylint: disable=unused-import
+    UserRole, BaseContext, Command, CommandPerm, ArgumentError)
+import default  # pylint: disable=unused-import  # registers the default commands and timers
+from timer_ import Timer  # pylint: disable=unused-import
 
 
 # BOT - main operation logic
@@ -33,24 +30,6 @@ class Config(BaseConfig):
     """Configuration data for the Twitch bot."""
     # custom attributes
 
-    @classmethod
-    def from_env(cls) -> Config:
-        config_fields = [field.name.upper() for field in fields(cls)]
-        config = dict(dotenv_values(".env").items())
-        if not set(config_fields).issubset(set(config.keys())):
-            raise RuntimeError("One or more configuration fields are missing")
-        for key, value in config.copy().items():
-            if key in {"ONLINE_CHANNELS", "OFFLINE_CHANNELS", "CAPABILITY"}:
-                config[key] = tuple(json.loads(value))  # type: ignore
-            elif key in {"RICH_IRC", "SHOW_ERRORS"}:
-                config[key] = value == "True"  # type: ignore
-            elif key in {"HISTORY_LIMIT"}:
-                config[key] = int(value)  # type: ignore
-            elif key not in config_fields:
-                del config[key]
-        config = {key.lower(): value for key, value in config.items()}
-        return cls(**config)  # type: ignore
-
 
 class Bot(BaseBot):
     """Universal chat bot manager for all connected channels."""
@@ -1,7 +1,14 @@
 """Deconstruction of IRC messages into specialized class instances."""
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import re
+import sys
+from typing import Callable
+
+
+# escape sequences used in tag values, a backslash before any other character is dropped
+TAG_ESCAPES = {':': ';', 's': ' ', '\\': '\\', 'r': '\r', 'n': '\n'}
+TAG_ESCAPE = re.compile(r"\\(.?)", re.DOTALL)
 
 
 class MessageParser:
@@ -9,115 +16,58 @@ class MessageParser:
     @classmethod
     def from_raw(cls, raw: str) -> Message:
         """Parse a raw IRC message into a usable Message instance."""
-        data, tags, type_ = raw.split(" :"), {}, None
-        if data[0].startswith('@'):
-            raw_tags = data.pop(0)[1:]
-            tags = cls._parse_tags(raw_tags)
-        if (command := data.pop(0).strip(':')).startswith("PING"):
+        command, _, trailing = raw.partition(" :")
+        raw_tags = ''
+        if command.startswith('@'):
+            raw_tags = command[1:]
+            command, _, trailing = trailing.partition(" :")
+        if (command := command.strip(':')).startswith("PING"):
             type_ = command[:4]
             return PingMessage(raw, type_)
         user = cls._parse_user(command)
-        type_ = cls._parse_type(command)
-        params = cls._parse_params(command, type_)
-        channel = cls._parse_channel(params)
-        message = cls._parse_message(data)
-        match type_:
-            case "001":
-                msg = LoginMessage(raw, type_)
-            case "CAP * ACK":
-                assert message
-                msg = CapabilitiesMessage(
-                    raw, type_, [word[10:] for word in message.split()])
-            case "353":
-                assert channel and message
-                msg = NamesMessage(raw, type_, channel, message.split())
-            case "RECONNECT":
-                msg = ReconnectMessage(raw, type_)
-            case "JOIN":
-                assert channel and user
-                msg = JoinMessage(raw, type_, channel, user)
-            case "PART":
-                assert channel and user
-                msg = PartMessage(raw, type_, channel, user)
-            case "366":
-                assert channel
-                msg = EndOfNamesMessage(raw, type_, channel)
-            case "NOTICE":
-                assert channel and message
-                msg = NoticeMessage(raw, type_, channel, message, tags)
-            case "USERSTATE":
-                assert channel
-                msg = UserstateMessage(raw, type_, channel, tags)
-            case "ROOMSTATE":
-                assert channel
-                msg = RoomstateMessage(raw, type_, channel, tags)
-            case "CLEARCHAT":
-                assert channel
-                msg = ClearchatMessage(raw, type_, channel, message, tags)
-            case "CLEARMSG":
-                assert channel and message
-                msg = ClearmsgMessage(raw, type_, channel, message, tags)
-            case "USERNOTICE":
-                assert channel
-                msg = UsernoticeMessage(raw, type_, channel, message, tags)
-            case "WHISPER":
-                assert user and params and message
-                msg = WhisperMessage(raw, type_, user, params, message, tags)
-            case "PRIVMSG":
-                assert channel and user and message
-                msg = ChatMessage(raw, type_, channel, user, message, tags)
-            case _:
-                msg = Message(raw, type_)
-        return msg
-
-    @staticmethod
-    def _parse_tags(raw_tags: str) -> dict[str, str]:
-        tags: dict[str, str] = {}
-        for tag in raw_tags.split(';'):
-            if (match := re.fullmatch(r"^(.*)=(.*)$", tag)):
-                tags[match[1]] = match[2]
-        return tags
+        message = cls._parse_message(trailing)
+        # chat messages dominate traffic, so take the channel straight from the command
+        if (chan_index := command.find(" PRIVMSG #")) != -1:
+            channel = sys.intern(command[chan_index+10:].partition(' ')[0])
+            return _build_chat(raw, "PRIVMSG", channel, user, None, message, raw_tags)
+        type_, params, channel = cls._split_command(command)
+        build = MESSAGE_BUILDERS.get(type_, _build_message)
+        return build(raw, type_, channel, user, params, message, raw_tags)
 
     @staticmethod
     def _parse_user(command: str) -> str | None:
         if command.startswith(("jtv ", "tmi.twitch.tv ")):
             return None
-        if (match := re.match(r"^([a-z0-9_]+)!(?:\1)@(?:\1)", command)):
-            return match[1]
+        # users are prefixed as nick!nick@nick.tmi.twitch.tv
+        nick, bang, host = command.partition('!')
+        if bang and nick and host.startswith(f"{nick}@{nick}"):
+            return nick
         return None
 
     @staticmethod
-    def _parse_type(command: str) -> str:
-        return "CAP * ACK" if "CAP * ACK" in command else command.split()[1]
-
-    @staticmethod
-    def _parse_params(command: str, msg_type: str) -> str | None:
-        params = command[command.index(msg_type)+1 + len(msg_type) :]
-        return params or None
+    def _split_command(command: str) -> tuple[str, str | None, str | None]:
+        _, _, rest = command.partition(' ')
+        type_, _, params = rest.partition(' ')
+        if type_ == "CAP" and params.startswith("* ACK"):
+            type_, params = "CAP * ACK", params[6:]
+        # types and channels repeat constantly, so interning makes later comparisons cheap
+        type_ = sys.intern(type_)
+        if not params:
+            return type_, None, None
+        if (chan_index := params.find('#')) == -1:
+            return type_, params, None
+        return type_, params, sys.intern(params[chan_index+1:].partition(' ')[0])
 
     @staticmethod
-    def _parse_channel(params: str | None) -> str | None:
-        def get_index(string: str, substring: str, start: int = 0) -> int | None:
-            try:
-                return string.index(substring, start)
-            except ValueError:
-                return None
-
-        if params is not None:
-            if (chan_index := get_index(params, '#')) is not None:
-                return params[chan_index+1 : get_index(params, ' ', chan_index)]
-
-    @staticmethod
-    def _parse_message(data: list[str]) -> str | None:
-        if data:
-            message = " :".join(data)
-            if ord(message[0]) == 1 and message[1:7] == "ACTION":
+    def _parse_message(message: str) -> str | None:
+        if message:
+            if message.startswith("\x01ACTION"):
                 message = f"/me{message[7:-1]}"
             return message.strip()
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """IRC message received from Twitch."""
     raw: str
@@ -127,7 +77,31 @@ class Message:
         return f"Message(type={self.type_})"
 
 
-@dataclass
+@dataclass(slots=True)
+class TaggedMessage(Message):
+    """
+    IRC message carrying IRCv3 tags.\n
+    Tags are kept as the raw string and only parsed into a dictionary on first access.
+    """
+    raw_tags: str = field(kw_only=True)
+    _tags: dict[str, str] | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def tags(self) -> dict[str, str]:
+        """Tags of the message, keyed by tag name."""
+        if self._tags is None:
+            self._tags = {key: value for key, separator, value
+                          in (tag.partition('=') for tag in self.raw_tags.split(';'))
+                          if separator}
+            if '\\' in self.raw_tags:  # only unescape values when there is anything to unescape
+                for key, value in self._tags.items():
+                    if '\\' in value:
+                        self._tags[key] = TAG_ESCAPE.sub(
+                            lambda match: TAG_ESCAPES.get(match[1], match[1]), value)
+        return self._tags
+
+
+@dataclass(slots=True)
 class LoginMessage(Message):
     """IRC message for a succesful login."""
 
@@ -135,7 +109,7 @@ class LoginMessage(Message):
         return "LoginMessage"
 
 
-@dataclass
+@dataclass(slots=True)
 class CapabilitiesMessage(Message):
     """IRC message for acquired capabilities."""
     capabilities: list[str]
@@ -144,7 +118,7 @@ class CapabilitiesMessage(Message):
         return f"CapabilitiesMessage(capabilities={self.capabilities})"
 
 
-@dataclass
+@dataclass(slots=True)
 class PingMessage(Message):
     """IRC message for a keepalive ping."""
 
@@ -152,7 +126,7 @@ class PingMessage(Message):
         return "PingMessage"
 
 
-@dataclass
+@dataclass(slots=True)
 class ReconnectMessage(Message):
     """IRC message for a reconnect signal."""
 
@@ -160,7 +134,7 @@ class ReconnectMessage(Message):
         return "ReconnectMessage"
 
 
-@dataclass
+@dataclass(slots=True)
 class JoinMessage(Message):
     """IRC message for joining a channel."""
     channel: str
@@ -170,7 +144,7 @@ class JoinMessage(Message):
         return f"JoinMessage(channel={self.channel}, user={self.user})"
 
 
-@dataclass
+@dataclass(slots=True)
 class PartMessage(Message):
     """IRC message for leaving a channel."""
     channel: str
@@ -180,7 +154,7 @@ class PartMessage(Message):
         return f"PartMessage(channel={self.channel}, user={self.user})"
 
 
-@dataclass
+@dataclass(slots=True)
 class NamesMessage(Message):
     """IRC message for a list of connected users."""
     channel: str
@@ -190,7 +164,7 @@ class NamesMessage(Message):
         return f"NamesMessage(channel={self.channel}, {len(self.users)} users)"
 
 
-@dataclass
+@dataclass(slots=True)
 class EndOfNamesMessage(Message):
     """IRC message for the end of a list of connected users."""
     channel: str
@@ -199,95 +173,180 @@ class EndOfNamesMessage(Message):
         return f"EndOfNamesMessage(channel={self.channel})"
 
 
-@dataclass
-class NoticeMessage(Message):
+@dataclass(slots=True)
+class NoticeMessage(TaggedMessage):
     """IRC message for system messages, often related to commands."""
     channel: str
     message: str
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"NoticeMessage(channel={self.channel}, "\
                f"message={self.message}, {len(self.tags)} tags)"
 
 
-@dataclass
-class UserstateMessage(Message):
+@dataclass(slots=True)
+class UserstateMessage(TaggedMessage):
     """IRC message for various data about the user."""
     channel: str
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"UserstateMessage(channel={self.channel}, {len(self.tags)} tags)"
 
 
-@dataclass
-class RoomstateMessage(Message):
+@dataclass(slots=True)
+class RoomstateMessage(TaggedMessage):
     """IRC message for various data about the channel."""
     channel: str
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"RoomstateMessage(channel={self.channel}, {len(self.tags)} tags)"
 
 
-@dataclass
-class ClearchatMessage(Message):
+@dataclass(slots=True)
+class ClearchatMessage(TaggedMessage):
     """IRC message for clearing a chat or all of a single user's message."""
     channel: str
     user: str | None
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"ClearchatMessage(channel={self.channel}, " \
                f"user={self.user}, {len(self.tags)} tags)"
 
 
-@dataclass
-class ClearmsgMessage(Message):
+@dataclass(slots=True)
+class ClearmsgMessage(TaggedMessage):
     """IRC message for the deletion of a single message."""
     channel: str
     message: str
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"ClearmsgMessage(channel={self.channel}, " \
                f"message={self.message}, {len(self.tags)} tags)"
 
 
-@dataclass
-class UsernoticeMessage(Message):
+@dataclass(slots=True)
+class UsernoticeMessage(TaggedMessage):
     """IRC message for any of various chat events."""
     channel: str
     message: str | None
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"UsernoticeMessage(channel={self.channel}, " \
                f"message={self.message}, {len(self.tags)} tags)"
 
 
-@dataclass
-class WhisperMessage(Message):
+@dataclass(slots=True)
+class WhisperMessage(TaggedMessage):
     """IRC message for a private message."""
     from_: str
     to: str
     message: str
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"WhisperMessage(from={self.from_}, to={self.to}, " \
                f"message={self.message}, {len(self.tags)} tags)"
 
 
-@dataclass
-class ChatMessage(Message):
+@dataclass(slots=True)
+class ChatMessage(TaggedMessage):
     """IRC message for a message sent in chat."""
     channel: str
     user: str
     message: str
-    tags: dict[str, str]
 
     def __str__(self) -> str:
         return f"ChatMessage(channel={self.channel}, user={self.user}, " \
                f"message={self.message}, {len(self.tags)} tags)"
+
+
+# builders take (raw, type_, channel, user, params, message, raw_tags) and return a Message
+def _build_message(raw: str, type_: str, *_) -> Message:
+    return Message(raw, type_)
+
+def _build_login(raw: str, type_: str, *_) -> LoginMessage:
+    return LoginMessage(raw, type_)
+
+def _build_capabilities(raw: str, type_: str, _channel, _user, _params,
+                        message: str | None, _raw_tags) -> CapabilitiesMessage:
+    assert message
+    return CapabilitiesMessage(raw, type_, [word[10:] for word in message.split()])
+
+def _build_names(raw: str, type_: str, channel: str | None, _user, _params,
+                 message: str | None, _raw_tags) -> NamesMessage:
+    assert channel and message
+    return NamesMessage(raw, type_, channel, message.split())
+
+def _build_reconnect(raw: str, type_: str, *_) -> ReconnectMessage:
+    return ReconnectMessage(raw, type_)
+
+def _build_join(raw: str, type_: str, channel: str | None, user: str | None,
+                *_) -> JoinMessage:
+    assert channel and user
+    return JoinMessage(raw, type_, channel, user)
+
+def _build_part(raw: str, type_: str, channel: str | None, user: str | None,
+                *_) -> PartMessage:
+    assert channel and user
+    return PartMessage(raw, type_, channel, user)
+
+def _build_end_of_names(raw: str, type_: str, channel: str | None, *_) -> EndOfNamesMessage:
+    assert channel
+    return EndOfNamesMessage(raw, type_, channel)
+
+def _build_notice(raw: str, type_: str, channel: str | None, _user, _params,
+                  message: str | None, raw_tags: str) -> NoticeMessage:
+    assert channel and message
+    return NoticeMessage(raw, type_, channel, message, raw_tags=raw_tags)
+
+def _build_userstate(raw: str, type_: str, channel: str | None, _user, _params,
+                     _message, raw_tags: str) -> UserstateMessage:
+    assert channel
+    return UserstateMessage(raw, type_, channel, raw_tags=raw_tags)
+
+def _build_roomstate(raw: str, type_: str, channel: str | None, _user, _params,
+                     _message, raw_tags: str) -> RoomstateMessage:
+    assert channel
+    return RoomstateMessage(raw, type_, channel, raw_tags=raw_tags)
+
+def _build_clearchat(raw: str, type_: str, channel: str | None, _user, _params,
+                     message: str | None, raw_tags: str) -> ClearchatMessage:
+    assert channel
+    return ClearchatMessage(raw, type_, channel, message, raw_tags=raw_tags)
+
+def _build_clearmsg(raw: str, type_: str, channel: str | None, _user, _params,
+                    message: str | None, raw_tags: str) -> ClearmsgMessage:
+    assert channel and message
+    return ClearmsgMessage(raw, type_, channel, message, raw_tags=raw_tags)
+
+def _build_usernotice(raw: str, type_: str, channel: str | None, _user, _params,
+                      message: str | None, raw_tags: str) -> UsernoticeMessage:
+    assert channel
+    return UsernoticeMessage(raw, type_, channel, message, raw_tags=raw_tags)
+
+def _build_whisper(raw: str, type_: str, _channel, user: str | None, params: str | None,
+                   message: str | None, raw_tags: str) -> WhisperMessage:
+    assert user and params and message
+    return WhisperMessage(raw, type_, user, params, message, raw_tags=raw_tags)
+
+def _build_chat(raw: str, type_: str, channel: str | None, user: str | None, _params,
+                message: str | None, raw_tags: str) -> ChatMessage:
+    assert channel and user and message
+    return ChatMessage(raw, type_, channel, user, message, raw_tags=raw_tags)
+
+MESSAGE_BUILDERS: dict[str, Callable[..., Message]] = {
+    "001": _build_login,
+    "CAP * ACK": _build_capabilities,
+    "353": _build_names,
+    "RECONNECT": _build_reconnect,
+    "JOIN": _build_join,
+    "PART": _build_part,
+    "366": _build_end_of_names,
+    "NOTICE": _build_notice,
+    "USERSTATE": _build_userstate,
+    "ROOMSTATE": _build_roomstate,
+    "CLEARCHAT": _build_clearchat,
+    "CLEARMSG": _build_clearmsg,
+    "USERNOTICE": _build_usernotice,
+    "WHISPER": _build_whisper,
+    "PRIVMSG": _build_chat
+    }
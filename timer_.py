@@ -16,13 +16,19 @@ class Timer:
     def __init__(self, func: Callable, name: str, interval: int):
         self.func = func
         self.interval = interval
-        self.last = time.perf_counter() - interval
+        self.last = time.monotonic() - interval
         Timer.timers[name] = self
 
     async def __call__(self, *args, **kwargs):
-        if time.perf_counter() - self.last >= self.interval:
+        now = time.monotonic()
+        if now - self.last >= self.interval:
+            self.last = now
             await self.func(*args, **kwargs)
-            self.last = time.perf_counter()
+
+    @property
+    def remaining(self) -> float:
+        """Seconds until the timer is next due to run."""
+        return max(0, self.last + self.interval - time.monotonic())
 
     @classmethod
     def timer(cls, name: str, interval: int):
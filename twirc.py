@@ -1,11 +1,31 @@
 """Anything that involves sending IRC messages to Twitch."""
 from __future__ import annotations
+from functools import lru_cache
+import sys
 
 from websockets.legacy.protocol import WebSocketCommonProtocol
 
 from colors import SGR, RGB, color
 
 
+# colored tags for each type of message sent to the server
+SENT_TAGS = {type_: color(type_, RGB.ORANGE) for type_ in (
+    "PASS", "NICK", "CAP REQ", "JOIN", "PART", "PONG")}
+BOT_TAG = color("BOT", RGB.GREEN)
+
+
+@lru_cache(maxsize=256)
+def colored_channel(channel: str) -> str:
+    """Colored display name of a channel, cached since the bot only uses a few."""
+    return color(f"#{channel}", SGR.BLUE)
+
+
+@lru_cache(maxsize=256)
+def submit_prefix(channel: str) -> str:
+    """Start of the console line logged for each message the bot sends to a channel."""
+    return f'[{BOT_TAG}] <{colored_channel(channel)}> '
+
+
 class NullWebsocket:
     """Placeholder for when a websocket is not available."""
     def __init__(self):
@@ -21,28 +41,16 @@ class NullWebsocket:
 
 
 class TwitchIRCClient:
-    """IRC client for communicating with Twitch via websocket."""
-    def __init__(self, websocket: WebSocketCommonProtocol | None = None,
-                 rich_irc: bool = False):
+    """
+    IRC client for communicating with Twitch via websocket.\n
+    Requests are sent silently, use `RichTwitchIRCClient` to also log them to the console.
+    """
+    def __init__(self, websocket: WebSocketCommonProtocol | None = None):
         self.websocket = websocket or NullWebsocket()
-        self.rich_irc = rich_irc
-
-    async def _pass(self, oauth: str):
-        """Send password (oauth) to the server for login."""
-        await self.websocket.send(f"PASS {oauth}")
-        if self.rich_irc:
-            print(f">[{color('PASS', RGB.ORANGE)}] oauth:***")
-
-    async def _nick(self, username: str):
-        """Send username to the server for login."""
-        await self.websocket.send(f"NICK {username}")
-        if self.rich_irc:
-            print(f">[{color('NICK', RGB.ORANGE)}] {username}")
 
     async def login(self, username: str, oauth: str):
-        """Send account credentials for login."""
-        await self._pass(oauth)
-        await self._nick(username)
+        """Send account credentials for login, as a single frame."""
+        await self.websocket.send(f"PASS {oauth}\r\nNICK {username}")
 
     async def request_capabilities(self, caps: list[str]):
         """
@@ -51,30 +59,47 @@ class TwitchIRCClient:
         """
         full_caps = [f"twitch.tv/{cap}" for cap in caps]
         await self.websocket.send(f"CAP REQ :{' '.join(full_caps)}\r\n")
-        if self.rich_irc:
-            print(f'>[{color("CAP REQ", RGB.ORANGE)}] {", ".join(caps)}')
 
-    async def join(self, channel: str):
-        """Send a request to join a channel."""
-        await self.websocket.send(f"JOIN #{channel}")
-        if self.rich_irc:
-            print(f'>[{color("JOIN", RGB.ORANGE)}] {color(f"#{channel}", SGR.BLUE)}')
+    async def join(self, *channels: str):
+        """Send a request to join one or more channels, as a single frame."""
+        if channels:
+            await self.websocket.send(f"JOIN {','.join([f'#{channel}' for channel in channels])}")
 
     async def part(self, channel: str):
         """Send a request to leave a channel."""
         await self.websocket.send(f"PART #{channel}")
-        if self.rich_irc:
-            print(f'>[{color("JOIN", RGB.ORANGE)}] {color(f"#{channel}", SGR.BLUE)}')
 
     async def pong(self):
         """Respond to a ping from the server to keep the bot connected."""
         await self.websocket.send("PONG :tmi.twitch.tv")
-        if self.rich_irc:
-            print(f">[{color('PONG', RGB.ORANGE)}]")
 
     async def submit(self, channel: str, message: str, show: bool = True):
         """Submit a chat message directly to a channel."""
         await self.websocket.send(f"PRIVMSG #{channel} :{message}")
         if show:
-            print(f'[{color("BOT", RGB.GREEN)}] <{color(f"#{channel}", SGR.BLUE)}> ' \
-                  f'{color(message, SGR.YELLOW)}')
+            sys.stdout.write(f'{submit_prefix(channel)}{color(message, SGR.YELLOW)}\n')
+
+
+class RichTwitchIRCClient(TwitchIRCClient):
+    """IRC client that also logs every request it sends to the console."""
+    async def login(self, username: str, oauth: str):
+        await super().login(username, oauth)
+        print(f">[{SENT_TAGS['PASS']}] oauth:***\n>[{SENT_TAGS['NICK']}] {username}")
+
+    async def request_capabilities(self, caps: list[str]):
+        await super().request_capabilities(caps)
+        print(f'>[{SENT_TAGS["CAP REQ"]}] {", ".join(caps)}')
+
+    async def join(self, *channels: str):
+        await super().join(*channels)
+        if channels:
+            print('\n'.join([f'>[{SENT_TAGS["JOIN"]}] {colored_channel(channel)}'
+                             for channel in channels]))
+
+    async def part(self, channel: str):
+        await super().part(channel)
+        print(f'>[{SENT_TAGS["PART"]}] {colored_channel(channel)}')
+
+    async def pong(self):
+        await super().pong()
+        print(f">[{SENT_TAGS['PONG']}]")